@@ -0,0 +1,54 @@
+"""
+Compare drawing speed of the software (Surface blitting) and
+SDL2 renderer compositing, using the example dashboard.
+
+Run with ``SDL_VIDEODRIVER=dummy`` to benchmark without a display.
+"""
+
+import sys
+import time
+
+from pygauges import Application
+from pygauges.renderer import RendererApplication
+from pygauges.displays import (ClockDisplay, VirualHorizonDisplay,
+                               LinesDisplay)
+
+
+FRAMES = 500
+
+
+def setup(app):
+    app.add_display(ClockDisplay((300, 300)), (10, 10))
+    app.add_display(VirualHorizonDisplay((300, 300)), (340, 10))
+    app.add_display(LinesDisplay((1260, 300)), (10, 340))
+    return app
+
+
+def benchmark(app, frames=FRAMES):
+    ## Warm up, so the cached layers are ready
+    for i in xrange(10):
+        app.update()
+        app.draw()
+
+    start = time.time()
+    for i in xrange(frames):
+        app.update()
+        app.draw()
+    return (time.time() - start) / frames
+
+
+def main(frames=FRAMES):
+    results = [
+        ('software blitting', Application(size=(1280, 1024))),
+        ('SDL2 software renderer',
+         RendererApplication(size=(1280, 1024), accelerated=False)),
+        ('SDL2 renderer', RendererApplication(size=(1280, 1024))),
+    ]
+    for name, app in results:
+        frame_time = benchmark(setup(app), frames)
+        print("{0:>24}: {1:7.2f} ms/frame ({2:6.1f} FPS)".format(
+            name, frame_time * 1000, 1. / frame_time))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
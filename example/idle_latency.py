@@ -0,0 +1,110 @@
+"""
+Measure CPU usage, frame rate and data-to-screen latency of the idle
+main loop, compared to the regular one, on two dashboards:
+
+* "pushed": a clock, plus a lines display only showing data pushed
+  from a thread
+* "example": the example dashboard, with continuously changing displays
+
+Run with ``SDL_VIDEODRIVER=dummy`` to measure without a display.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+import pygame
+
+from pygauges import Application
+from pygauges.displays import (ClockDisplay, VirualHorizonDisplay,
+                               LinesDisplay)
+
+
+DURATION = 10  # seconds
+DATA_RATE = 5  # samples per second, on average
+
+
+class PushedLinesDisplay(LinesDisplay):
+    """Lines display only showing data pushed from outside"""
+
+    lines_count = 1
+    sample_rate = None
+
+
+class CountingApplication(Application):
+    """Application counting the frames drawn"""
+
+    frames = 0
+
+    def draw(self):
+        self.frames += 1
+        super(CountingApplication, self).draw()
+
+
+def feed_data(app, display, stop):
+    while not stop.is_set():
+        time.sleep(random.expovariate(DATA_RATE))
+        value = random.uniform(display.ymin, display.ymax)
+        app.notify_data(display, {0: value})
+
+
+def setup_pushed(app):
+    display = PushedLinesDisplay((610, 300))
+    app.add_display(ClockDisplay((300, 300)), (10, 10))
+    app.add_display(display, (320, 10))
+    return display
+
+
+def setup_example(app):
+    app.add_display(ClockDisplay((300, 300)), (10, 10))
+    app.add_display(VirualHorizonDisplay((300, 300)), (320, 10))
+    app.add_display(LinesDisplay((610, 300)), (630, 10))
+    return None
+
+
+def measure(setup, idle_mode, duration=DURATION):
+    app = CountingApplication(size=(1250, 320))
+    app.idle_mode = idle_mode
+    display = setup(app)
+
+    stop = threading.Event()
+    if display is not None:
+        feeder = threading.Thread(
+            target=feed_data, args=(app, display, stop))
+        feeder.start()
+    timer = threading.Timer(
+        duration, pygame.event.post, [pygame.event.Event(pygame.QUIT)])
+    timer.start()
+
+    start = os.times()
+    app.mainloop()
+    end = os.times()
+    stop.set()
+    if display is not None:
+        feeder.join()
+
+    cpu_time = (end[0] - start[0]) + (end[1] - start[1])
+    wall_time = end[4] - start[4]
+    return (cpu_time / wall_time, app.frames / wall_time,
+            sorted(app.data_latencies))
+
+
+def main(duration=DURATION):
+    for name, setup in (('pushed', setup_pushed),
+                        ('example', setup_example)):
+        for idle_mode in (False, True):
+            cpu, fps, latencies = measure(setup, idle_mode, duration)
+            print("{0:>7} idle_mode={1!s:5}: CPU {2:5.1f}%, "
+                  "{3:5.1f} frames/s".format(
+                      name, idle_mode, cpu * 100, fps))
+            if latencies:
+                print("  latency: median {0:.1f} ms, max {1:.1f} ms "
+                      "({2} samples)".format(
+                          latencies[len(latencies) // 2] * 1000,
+                          latencies[-1] * 1000, len(latencies)))
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
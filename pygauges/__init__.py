@@ -21,9 +21,19 @@ Objects:
   display on the given surface.
 """
 
+from collections import deque
+import math
+import time
+
 import pygame
 
-from .utils import colors, lazy_property
+from .themes import default_theme
+from .utils import lazy_property
+
+
+## Event posted by data sources to tell the application
+## new data is available (see :py:meth:`Application.notify_data`)
+DATA_EVENT = pygame.USEREVENT + 1
 
 
 class ApplicationQuit(Exception):
@@ -36,10 +46,23 @@ class Application(object):
     max_fps = 50
     show_fps = True
     default_window_size = 1280, 1024
+    theme = default_theme
+
+    ## In idle mode, the main loop sleeps until new data arrives or
+    ## a display needs to be updated, instead of drawing at max_fps.
+    ## Requires pygame >= 2.0.1.
+    idle_mode = False
 
     _fullscreen = False
+    _needs_redraw = True
+    _next_deadline = None
+    _last_draw_time = 0
+    _data_time = None
+
+    def __init__(self, size=None, fullscreen=False, theme=None):
 
-    def __init__(self, size=None, fullscreen=False):
+        if theme is not None:
+            self.theme = theme
 
         pygame.init()
         pygame.display.set_caption(self.application_title)
@@ -62,12 +85,33 @@ class Application(object):
         ## List of displays to be drawn on this application
         self.displays = []
 
+        ## Delays between data notifications and the redraw
+        ## showing the data, in seconds (idle mode only)
+        self.data_latencies = deque(maxlen=1000)
+
     @lazy_property
     def fps_font(self):
         ## Orbitron is a quite cool font, under Open Font License
         ## See: https://www.theleagueofmoveabletype.com/orbitron
         return pygame.font.SysFont('Orbitron, monospace', 20, True, False)
 
+    @lazy_property
+    def palette(self):
+        """The current theme, mapped to the screen pixel format"""
+        return self.theme.get_palette(self.screen)
+
+    def set_theme(self, theme):
+        """
+        Change the application theme, at runtime.
+
+        Displays not having their own theme will switch to
+        the new one as well.
+        """
+        self.theme = theme
+        del self.palette
+        for display in self.displays:
+            display['display'].on_theme_change()
+
     def set_video_mode(self, resolution=None, fullscreen=False):
         """
         Change the current video mode.
@@ -103,20 +147,121 @@ class Application(object):
 
         self.screen = pygame.display.set_mode(resolution, screen_flags)
 
+        ## The pixel format might have changed too
+        del self.palette
+
     def mainloop(self):
+        if self.idle_mode:
+            return self.idle_mainloop()
+
         while True:
             try:
                 self.process_events()
+                self.update()
                 self.draw()
                 self.clock.tick(self.max_fps)
             except ApplicationQuit:
                 return
 
+    def idle_mainloop(self):
+        """
+        Main loop only redrawing when needed: when new data arrives,
+        a display deadline expires or the window needs refreshing.
+        """
+        while True:
+            try:
+                self.wait_events()
+                self._last_draw_time = time.time()
+                self.update()
+                self.draw()
+                self.clock.tick()
+                self.after_draw()
+            except ApplicationQuit:
+                return
+
+    def wait_events(self):
+        """
+        Process events, blocking until it is time to redraw.
+        """
+        min_interval = 1.0 / self.max_fps
+        self.process_events()
+
+        while True:
+            if self._needs_redraw:
+                deadline = 0
+            else:
+                deadline = self._next_deadline
+
+            if deadline is not None:
+                ## Never redraw faster than max_fps, even if
+                ## displays are changing continuously.
+                deadline = max(deadline, self._last_draw_time + min_interval)
+
+            if deadline is None:
+                event = pygame.event.wait()
+            else:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    return
+                event = pygame.event.wait(int(math.ceil(timeout * 1000)))
+
+            if event.type != pygame.NOEVENT:
+                self.process_event(event)
+                self.process_events()
+
+    def after_draw(self):
+        """
+        Book-keeping after a redraw in idle mode: find out when the
+        next one is due, and measure data-to-screen latency.
+        """
+        now = time.time()
+        self._needs_redraw = False
+
+        if self._data_time is not None:
+            self.data_latencies.append(now - self._data_time)
+            self._data_time = None
+
+        deadlines = [display['display'].next_deadline(now)
+                     for display in self.displays]
+        deadlines = [d for d in deadlines if d is not None]
+        self._next_deadline = min(deadlines) if deadlines else None
+
+    def notify_data(self, display=None, data=None):
+        """
+        Tell the application new data is available, waking it up
+        if idle. Can be called from other threads.
+
+        :param display:
+            If specified, ``data`` will be passed to its
+            ``push_data()`` method, from the main thread.
+        """
+        pygame.event.post(pygame.event.Event(
+            DATA_EVENT, time=time.time(), display=display, data=data))
+
+    def update(self):
+        """Let displays update their contents, before a redraw"""
+        now = time.time()
+        for display in self.displays:
+            display['display'].update(now)
+
     def process_events(self):
         for event in pygame.event.get():
             self.process_event(event)
 
     def process_event(self, event):
+        if event.type == DATA_EVENT:
+            ## Keep the oldest pending notification, for latency
+            if self._data_time is None:
+                self._data_time = event.time
+            if event.display is not None:
+                event.display.push_data(event.data)
+            self._needs_redraw = True
+            return
+
+        if event.type != pygame.MOUSEMOTION:
+            ## Keypresses, window exposure, etc.
+            self._needs_redraw = True
+
         if event.type == pygame.QUIT:
             raise ApplicationQuit()
 
@@ -131,18 +276,39 @@ class Application(object):
 
             elif event.key == pygame.K_F5:
                 ## F5 means "do a full refresh"
-
-                # This is to make the screen "flash"
-                self.screen.fill([0xff, 0xff, 0xff])
-                pygame.display.flip()
-                pygame.time.delay(40)
+                self.flash_screen()
 
                 # then, stuff will be refreshed automatically..
 
+            else:
+                for display in self.displays:
+                    display['display'].process_event(event)
+
+        elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            ## Mouse clicks go to the display under the pointer,
+            ## with coordinates relative to it.
+            for display in reversed(self.displays):
+                rect = pygame.Rect(
+                    display['position'], display['display'].size)
+                if rect.collidepoint(event.pos):
+                    attrs = dict(event.dict)
+                    attrs['pos'] = (event.pos[0] - rect.left,
+                                    event.pos[1] - rect.top)
+                    display['display'].process_event(
+                        pygame.event.Event(event.type, attrs))
+                    break
+
+    def flash_screen(self):
+        """Make the screen "flash" white for a moment"""
+        self.screen.fill([0xff, 0xff, 0xff])
+        pygame.display.flip()
+        pygame.time.delay(40)
+
     def draw(self):
         ## Do a full redraw
         ## todo: avoid fully redrawing if not needed, for performance..
-        self.screen.fill(colors['base03'])
+        palette = self.palette
+        self.screen.fill(palette['base03'])
 
         # Draw sensors on this screen
         for display in self.displays:
@@ -152,26 +318,37 @@ class Application(object):
                 display['position'])
 
         # Draw FPS label
+        text, col = self.render_fps_label()
+        text_rect = text.get_rect()
+        text_rect.bottomleft = 0, self.screen.get_height()
+        self.screen.fill(palette[col], text_rect)
+        self.screen.blit(text, text_rect)
+
+        # Actually redraw the screen
+        pygame.display.flip()
+
+    def render_fps_label(self):
+        """
+        Render the FPS counter label.
+
+        :return: a (text_surface, background_color_name) tuple
+        """
         fps = self.clock.get_fps()
 
         if fps >= 40:
-            col = colors['green']
+            col = 'green'
         elif fps >= 25:
-            col = colors['yellow']
+            col = 'yellow'
         else:
-            col = colors['red']
+            col = 'red'
 
         text = self.fps_font.render(
-            " {:2d} FPS ".format(int(fps)), True, colors['base03'])
-        text_rect = text.get_rect()
-        text_rect.bottomleft = 0, self.screen.get_height()
-        self.screen.fill(col, text_rect)
-        self.screen.blit(text, text_rect)
-
-        # Actually redraw the screen
-        pygame.display.flip()
+            " {:2d} FPS ".format(int(fps)), True, self.palette.rgb('base03'))
+        return text, col
 
     def add_display(self, display, position):
+        display.parent = self
+        display.on_theme_change()
         self.displays.append({
             'display': display,
             'position': position,
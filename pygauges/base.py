@@ -6,9 +6,18 @@ import warnings
 
 import pygame
 
+from .themes import default_theme
 from .utils import lazy_property
 
 
+def _union_rects(rects):
+    """Smallest rect containing all the non-empty ones"""
+    rects = [r for r in rects if r.width and r.height]
+    if not rects:
+        return pygame.Rect(0, 0, 0, 0)
+    return rects[0].unionall(rects[1:])
+
+
 class Drawable(object):
     """
     Base for the objects providing drawing functionality.
@@ -20,13 +29,27 @@ class Drawable(object):
     the actual heavy lifting.
     """
 
-    def __init__(self, size, **kwargs):
+    ## Object containing this drawable (eg. the application);
+    ## used to inherit the theme, if none is set explicitly.
+    parent = None
+
+    _theme = None
+
+    ## Area of the surface changed by the last redraw (a Rect,
+    ## possibly empty), or None if it may have changed entirely.
+    dirty_rect = None
+
+    def __init__(self, size, theme=None, **kwargs):
         """
         :param size:
             The size of the drawable space allocated
             to this widget.
+        :param theme:
+            The color theme to use. If not specified, the
+            one of the parent will be used.
         """
         self.size = size
+        self._theme = theme
         if len(kwargs):
             warnings.warn(
                 'Unknown keyword arguments to drawable: {0}'.format(
@@ -48,6 +71,33 @@ class Drawable(object):
         # Should update the inner surface and make sure it's redrawn
         # next time it's requested
         del self._surface
+        del self.palette
+
+    @property
+    def theme(self):
+        if self._theme is not None:
+            return self._theme
+        if self.parent is not None:
+            return self.parent.theme
+        return default_theme
+
+    @theme.setter
+    def theme(self, value):
+        self._theme = value
+        self.on_theme_change()
+
+    def on_theme_change(self):
+        # Colors must be mapped again, and all the cached layers
+        # redrawn using the new ones.
+        del self.palette
+
+    @lazy_property
+    def palette(self):
+        """
+        The current theme, mapped to the format of our surface.
+        Draw functions should always pick colors from here.
+        """
+        return self.theme.get_palette(self._surface)
 
     @property
     def width(self):
@@ -81,10 +131,48 @@ class Drawable(object):
 
     def draw(self, surface):
         """
-        Draw the widget contents on the specified surface
+        Draw the widget contents on the specified surface.
+
+        May return the list of rects actually drawn on (eg. the
+        ones returned by the ``pygame.draw`` functions), so that
+        only those areas need to be redrawn next time; None means
+        the whole surface.
         """
         pass
 
+    def update(self, now):
+        """
+        Update the contents (eg. read new data), if needed.
+        Called by the application before each redraw, with the
+        current time (as returned by ``time.time()``).
+        """
+        pass
+
+    def push_data(self, data):
+        """
+        Receive data sent with :py:meth:`Application.notify_data`.
+        """
+        pass
+
+    def process_event(self, event):
+        """
+        Handle an input event: keypresses not used by the
+        application, and mouse clicks on this drawable (with
+        ``pos`` relative to it).
+        """
+        pass
+
+    def next_deadline(self, now):
+        """
+        Time (as returned by ``time.time()``) at which the contents
+        will need to be redrawn, or None if only new data (see
+        :py:meth:`Application.notify_data`) can change them.
+
+        Used by the application main loop in idle mode. By default,
+        drawables are assumed to change continuously.
+        """
+        return now
+
 
 class WithBackground(object):
     """
@@ -93,10 +181,18 @@ class WithBackground(object):
 
     background_color = (0, 0, 0)
 
+    ## Background the surface was last composed on, and
+    ## area covered by the foreground drawn over it
+    _composed_background = None
+    _drawn_rect = None
+
     def on_size_change(self):
-        del self._surface
+        super(WithBackground, self).on_size_change()
+        del self.background_surface
+
+    def on_theme_change(self):
+        super(WithBackground, self).on_theme_change()
         del self.background_surface
-        del self.foreground_surface
 
     @lazy_property
     def background_surface(self):
@@ -105,7 +201,7 @@ class WithBackground(object):
         the display is resized.
         """
         surface = self.new_surface(alpha=False)
-        surface.fill(self.background_color)
+        surface.fill(self.palette[self.background_color])
         self.draw_background(surface)
         return surface
 
@@ -113,14 +209,35 @@ class WithBackground(object):
     def surface(self):
         """
         Property returning the surface, with all the layers stacked.
+
+        When :py:meth:`draw` tells which areas it drew on, only
+        those get the background restored at the next redraw, and
+        :py:attr:`dirty_rect` is set to the area that changed.
         """
         surface = self._surface
-        surface.blit(self.background_surface, (0, 0))
-        self.draw(surface)
+        background = self.background_surface
+        if background is not self._composed_background \
+                or self._drawn_rect is None:
+            surface.blit(background, (0, 0))
+            restored = None
+        else:
+            restored = self._drawn_rect
+            surface.blit(background, restored, restored)
+        self._composed_background = background
+
+        drawn = self.draw(surface)
+        if drawn is None:
+            self._drawn_rect = self.dirty_rect = None
+            return surface
+
+        self._drawn_rect = _union_rects(drawn).clip(surface.get_rect())
+        if restored is None:
+            self.dirty_rect = None
+        else:
+            self.dirty_rect = _union_rects((restored, self._drawn_rect))
         return surface
 
     def draw(self, surface):
-        # todo: how do we check wheter the surface is already ok?
         pass
 
     def draw_background(self, surface):
@@ -2,7 +2,6 @@
 Miscellaneous default displays
 """
 
-from collections import deque
 import datetime
 import math
 import random
@@ -11,21 +10,32 @@ import time
 import pygame
 
 from .base import BaseDisplay, WithBackground
-from .utils import colors, rescale, lazy_property
+from .history import SummaryPyramid
+from .utils import lazy_property
 
 
 class ClockDisplay(WithBackground, BaseDisplay):
     """Just a clock, displaying time"""
 
-    ## Style
-    background_color = colors['base03']
-    inner_background_color = colors['base02']
-    border_color = colors['base0']
+    ## Style (color names, from the current theme)
+    background_color = 'base03'
+    inner_background_color = 'base02'
+    border_color = 'base0'
     border_width = 3
-    needle_color = colors['base2']
-    labels_color = colors['base00']
+    needle_color = 'base2'
+    seconds_needle_color = 'base0'
+    labels_color = 'base00'
     draw_numbers = True
 
+    def on_theme_change(self):
+        super(ClockDisplay, self).on_theme_change()
+        del self.needle_colors
+
+    @lazy_property
+    def needle_colors(self):
+        return (self.palette[self.needle_color],
+                self.palette[self.seconds_needle_color])
+
     @lazy_property
     def numbers_font(self):
         font_size = min(*self.size) / 20
@@ -36,16 +46,17 @@ class ClockDisplay(WithBackground, BaseDisplay):
         width, height = surface.get_width(), surface.get_height()
         radius = min(width, height) / 2
         center = (width / 2, height / 2)
+        palette = self.palette
 
         pygame.draw.circle(
             surface,
-            self.inner_background_color,
+            palette[self.inner_background_color],
             center,
             radius,
             0)  # width=0 -> fill
         pygame.draw.circle(
             surface,
-            self.border_color,
+            palette[self.border_color],
             center,
             radius,
             self.border_width)
@@ -65,7 +76,7 @@ class ClockDisplay(WithBackground, BaseDisplay):
                     if hour == 0:
                         hour = 12
                     text = self.numbers_font.render(
-                        str(hour), True, self.labels_color)
+                        str(hour), True, palette.rgb(self.labels_color))
                     text_rect = text.get_rect()
                     text_rect.center = x, y
                     surface.blit(text, text_rect)
@@ -73,7 +84,7 @@ class ClockDisplay(WithBackground, BaseDisplay):
                 else:
                     pygame.draw.circle(
                         surface,
-                        self.labels_color, (x, y), 3, 0)
+                        palette[self.labels_color], (x, y), 3, 0)
 
             else:
                 x1 = center[0] + int(dx * (radius - 10))
@@ -81,12 +92,16 @@ class ClockDisplay(WithBackground, BaseDisplay):
                 x2 = center[0] + int(dx * (radius - 24))
                 y2 = center[1] + int(dy * (radius - 24))
                 pygame.draw.aaline(
-                    surface, self.labels_color, (x1, y1), (x2, y2))
+                    surface, palette[self.labels_color], (x1, y1), (x2, y2))
 
     def read_data(self):
         now = datetime.datetime.now()
         return (now.hour, now.minute, now.second)
 
+    def next_deadline(self, now):
+        ## Needles only move once per second
+        return math.floor(now) + 1
+
     def draw(self, surface):
         hour, minute, second = self.read_data()
 
@@ -94,36 +109,48 @@ class ClockDisplay(WithBackground, BaseDisplay):
         height = surface.get_height()
         radius = min(width, height) / 2
         center = (width / 2, height / 2)
+        needle_color, seconds_needle_color = self.needle_colors
 
         needles = [
-            (((hour % 12) - 3) * 30, .8, colors['base2']),  # / 12 * 360
-            ((minute - 15) * 6, 1, colors['base2']),  # / 60 * 360
-            ((second - 15) * 6, 1, colors['base0'])  # / 60 * 360
+            (((hour % 12) - 3) * 30, .8, needle_color),  # / 12 * 360
+            ((minute - 15) * 6, 1, needle_color),  # / 60 * 360
+            ((second - 15) * 6, 1, seconds_needle_color)  # / 60 * 360
         ]
 
+        drawn = []
         for value, length, color in needles:
             angle = math.radians(value)
             x = center[0] + int(math.cos(angle) * radius * length)
             y = center[0] + int(math.sin(angle) * radius * length)
-            pygame.draw.aaline(
-                surface, color, center, (x, y))
+            drawn.append(pygame.draw.aaline(
+                surface, color, center, (x, y)))
+        return drawn
 
 
 class VirualHorizonDisplay(WithBackground, BaseDisplay):
-    border_color = colors['base0']
+    background_color = 'base03'
+    border_color = 'base0'
     border_width = 1
-    needle_pitch_color = colors['red']
-    needle_roll_color = colors['yellow']
+    needle_pitch_color = 'red'
+    needle_roll_color = 'yellow'
     needle_width = 1
 
+    def on_theme_change(self):
+        super(VirualHorizonDisplay, self).on_theme_change()
+        del self.needle_colors
+
+    @lazy_property
+    def needle_colors(self):
+        return (self.palette[self.needle_pitch_color],
+                self.palette[self.needle_roll_color])
+
     def draw_background(self, surface):
         width, height = surface.get_width(), surface.get_height()
         radius = min(width, height) / 2
         center = (width / 2, height / 2)
-        surface.fill(colors['base03'])
         pygame.draw.circle(
             surface,
-            self.border_color,
+            self.palette[self.border_color],
             center,
             radius,
             self.border_width)
@@ -178,6 +205,7 @@ class VirualHorizonDisplay(WithBackground, BaseDisplay):
         pitch, roll = (math.radians(x) for x in status)
         radius = min(width, height) / 2
         center = (width / 2, height / 2)
+        pitch_color, roll_color = self.needle_colors
 
         # First, we consider the pitch in order to decide
         # where to draw the line.
@@ -186,21 +214,22 @@ class VirualHorizonDisplay(WithBackground, BaseDisplay):
         horiz_h = center[1] + (math.sin(pitch) * radius)
         half_width = math.cos(pitch) * radius
 
-        pygame.draw.aaline(
+        pitch_rect = pygame.draw.aaline(
             surface,
-            self.needle_pitch_color,
+            pitch_color,
             (center[0] - half_width, horiz_h),
             (center[0] + half_width, horiz_h),
             self.needle_width)
 
         roll_h = math.cos(roll) * radius
         roll_v = math.sin(roll) * radius
-        pygame.draw.aaline(
+        roll_rect = pygame.draw.aaline(
             surface,
-            self.needle_roll_color,
+            roll_color,
             (center[0] - roll_h, center[1] - roll_v),
             (center[0] + roll_h, center[1] + roll_v),
             self.needle_width)
+        return [pitch_rect, roll_rect]
 
 
 class LinesDisplay(WithBackground, BaseDisplay):
@@ -208,22 +237,35 @@ class LinesDisplay(WithBackground, BaseDisplay):
     A display showing a "lines" greaph
     """
 
-    border_color = colors['base0']
+    background_color = 'base03'
+    border_color = 'base0'
     border_width = 1
     line_colors = {
-        0: colors['green'],
-        1: colors['red'],
-        2: colors['violet'],
-        3: colors['orange'],
-        4: colors['blue'],
-        5: colors['yellow'],
-        6: colors['cyan'],
-        7: colors['magenta'],
+        0: 'green',
+        1: 'red',
+        2: 'violet',
+        3: 'orange',
+        4: 'blue',
+        5: 'yellow',
+        6: 'cyan',
+        7: 'magenta',
     }
 
-    # Maximum stored values
+    # Number of values visible at once, by default
     max_values = 300
 
+    # Values read per second (None to only show data pushed
+    # with Application.notify_data), and maximum stored values
+    # for each line: one hour.
+    sample_rate = 50
+    history_size = 3600 * sample_rate
+
+    # Zoom limits (number of visible values), and
+    # steps for zoom / pan controls
+    min_view_size = 10
+    zoom_step = 1.5
+    pan_step = .25
+
     # Y axis range
     ymin, ymax = -20, 20
 
@@ -235,13 +277,125 @@ class LinesDisplay(WithBackground, BaseDisplay):
 
         self.lines = {}
         for i in xrange(self.lines_count):
-            self.lines[i] = deque(maxlen=self.max_values)
+            self.lines[i] = SummaryPyramid(self.history_size)
+
+        ## Number of values in view, and index of the last one
+        ## (None means "follow the newest values")
+        self.view_size = self.max_values
+        self.view_end = None
+
+        ## When the next value should be read
+        self._next_sample = 0
+
+    def update(self, now):
+        if self.sample_rate is None or now < self._next_sample:
+            return
+        self.push_data(self.read_data())
+
+        self._next_sample += 1.0 / self.sample_rate
+        if self._next_sample <= now:
+            ## We're late (eg. frames are slower than the sample
+            ## rate): skip the missed samples.
+            self._next_sample = now + 1.0 / self.sample_rate
+
+    def push_data(self, data):
+        for line_id, value in data.iteritems():
+            self.lines[line_id].append(value)
+        if self.view_end is not None:
+            ## Old values might have been dropped from under the view
+            self.pan_to(self.view_end)
+
+    def next_deadline(self, now):
+        if self.sample_rate is None:
+            return None
+        return self._next_sample
+
+    @property
+    def values_count(self):
+        """Total number of values read so far"""
+        return self.lines[0].count if self.lines else 0
+
+    @property
+    def oldest_value(self):
+        """Index of the oldest value still stored"""
+        return self.lines[0].first if self.lines else 0
+
+    def view_range(self):
+        """The (start, end) range of values in view"""
+        end = self.view_end
+        if end is None:
+            end = self.values_count
+        return end - self.view_size, end
+
+    def zoom(self, factor, anchor=.5):
+        """
+        Zoom in (factor > 1) or out (factor < 1) the view.
+
+        :param anchor:
+            position (0 is left, 1 is right) of the point
+            that should stay fixed while zooming. Ignored when
+            following the newest values, that keep the view
+            anchored on the right edge.
+        """
+        start, end = self.view_range()
+        pivot = start + anchor * self.view_size
+        self.view_size = min(max(self.view_size / factor,
+                                 self.min_view_size),
+                             self.history_size)
+        if self.view_end is not None:
+            self.pan_to(pivot + (1 - anchor) * self.view_size)
+
+    def pan(self, amount):
+        """
+        Move the view back (amount < 0) or forward (amount > 0) in
+        time, by the given fraction of its size.
+        """
+        start, end = self.view_range()
+        self.pan_to(end + amount * self.view_size)
+
+    def pan_to(self, end):
+        """
+        Move the view to end at the given value index, without
+        going before the oldest stored value. Going past the newest
+        value goes back to following the data.
+        """
+        end = max(end, self.oldest_value + self.view_size)
+        if end >= self.values_count:
+            self.view_end = None
+        else:
+            self.view_end = end
+
+    def process_event(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button in (4, 5):
+            ## Mouse wheel: zoom around the pointer
+            anchor = float(event.pos[0]) / self.width
+            if event.button == 4:
+                self.zoom(self.zoom_step, anchor)
+            else:
+                self.zoom(1 / self.zoom_step, anchor)
+
+        elif event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_PLUS, pygame.K_EQUALS,
+                             pygame.K_KP_PLUS):
+                self.zoom(self.zoom_step)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.zoom(1 / self.zoom_step)
+            elif event.key == pygame.K_LEFT:
+                self.pan(-self.pan_step)
+            elif event.key == pygame.K_RIGHT:
+                self.pan(self.pan_step)
+            elif event.key == pygame.K_END:
+                ## Back to the newest values
+                self.view_end = None
+
+    def on_theme_change(self):
+        super(LinesDisplay, self).on_theme_change()
+        del self.mapped_line_colors
 
     @lazy_property
-    def background_surface(self):
-        surface = self.new_surface(alpha=False)
-        self.draw_background(surface)
-        return surface
+    def mapped_line_colors(self):
+        return dict((line_id, self.palette[color])
+                    for line_id, color in self.line_colors.iteritems())
 
     def _read_line(self, line_id, cur_time=None):
         if cur_time is None:
@@ -275,42 +429,54 @@ class LinesDisplay(WithBackground, BaseDisplay):
         return data
 
     def draw_background(self, surface):
-        surface.fill(colors['base03'])
-        pygame.draw.rect(surface, self.border_color, surface.get_rect(), 1)
+        pygame.draw.rect(
+            surface, self.palette[self.border_color], surface.get_rect(), 1)
 
     def draw(self, surface):
-        status = self.read_data()
-
-        for k, v in status.iteritems():
-            self.lines[k].append(v)
-
         #self.surface.fill(colors['base03'])
         #self.surface.blit(self.background_surface, (0, 0))
 
         width, height = surface.get_width(), surface.get_height()
-        x_units = float(width) / self.max_values
+        line_colors = self.mapped_line_colors
+        start, end = self.view_range()
+        x_units = float(width) / (end - start)
 
-        ## Draw all the historical data
-        for line_id, line_data in self.lines.iteritems():
-            num_values = len(line_data)
-            missing_values = self.max_values - num_values
-            start_pos = missing_values * x_units
-            prev_point = None
-
-            for value in line_data:
-                draw_x = start_pos
-                draw_y = rescale(
-                    value,
-                    self.ymin,
-                    self.ymax,
-                    height, 0)
-
-                if prev_point is not None:
-                    pygame.draw.aaline(
-                        surface,
-                        self.line_colors[line_id],
-                        prev_point,
-                        (draw_x, draw_y))
+        ## Same as rescale(value, ymin, ymax, height, 0), inlined
+        ## in the loops below as it's called for each point.
+        ymin = self.ymin
+        y_units = float(height) / (self.ymax - ymin)
 
-                prev_point = (draw_x, draw_y)
-                start_pos += x_units
+        ## Draw the historical data in view
+        drawn = []
+        for line_id, line_data in self.lines.iteritems():
+            color = line_colors[line_id]
+
+            if x_units >= 1:
+                ## Zoomed in: at least one pixel per sample,
+                ## draw the samples themselves.
+                first, values = line_data.samples(
+                    int(start), int(math.ceil(end)) + 1)
+                points = [((first + i - start) * x_units,
+                           height - (value - ymin) * y_units)
+                          for i, value in enumerate(values)]
+                if len(points) > 1:
+                    drawn.append(pygame.draw.aalines(
+                        surface, color, False, points))
+                continue
+
+            ## Zoomed out: draw the (min, max) envelope of each
+            ## column, using the summarized data. A zig-zag line
+            ## between min and max is way faster than filling
+            ## a polygon, and covers the same pixels.
+            envelope = []
+            columns = line_data.summarize(start, end, width)
+            for x, column in enumerate(columns):
+                if column is None:
+                    continue
+                vmin, vmax, mean = column
+                envelope.append((x, height - (vmax - ymin) * y_units))
+                envelope.append((x, height - (vmin - ymin) * y_units))
+            if envelope:
+                drawn.append(pygame.draw.lines(
+                    surface, color, False, envelope))
+        return drawn
@@ -0,0 +1,236 @@
+"""
+Storage for long histories of values, summarized at multiple
+resolutions so they can be displayed at any zoom level.
+"""
+
+from array import array
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, only used to speed things up
+    numpy = None
+
+
+class _Tier(object):
+    """
+    One level of the pyramid: buckets summarizing ``size``
+    consecutive samples each.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.first = 0  # bucket number of the first stored bucket
+        self.mins = array('d')
+        self.maxs = array('d')
+        self.sums = array('d')
+        self.counts = array('d')
+
+    def append(self, value, index):
+        if index % self.size == 0:
+            ## First sample of a new bucket
+            self.mins.append(value)
+            self.maxs.append(value)
+            self.sums.append(value)
+            self.counts.append(1)
+        else:
+            if value < self.mins[-1]:
+                self.mins[-1] = value
+            if value > self.maxs[-1]:
+                self.maxs[-1] = value
+            self.sums[-1] += value
+            self.counts[-1] += 1
+
+    def trim(self, first_sample, values):
+        """
+        Drop the buckets only containing samples before first_sample.
+
+        :param values: the stored samples, starting at first_sample;
+            used to summarize again the first bucket, if some of its
+            samples were dropped too.
+        """
+        drop = first_sample // self.size - self.first
+        if drop > 0:
+            for data in (self.mins, self.maxs, self.sums, self.counts):
+                del data[:drop]
+            self.first += drop
+
+        offset = first_sample % self.size
+        if offset and len(self.counts):
+            kept = values[:self.size - offset]
+            self.mins[0] = min(kept)
+            self.maxs[0] = max(kept)
+            self.sums[0] = sum(kept)
+            self.counts[0] = len(kept)
+
+
+class SummaryPyramid(object):
+    """
+    History of a series of values.
+
+    Besides the raw samples, keeps a "pyramid" of summaries: each
+    tier has (min, max, mean) buckets of ``fanout`` times the samples
+    of the one below. Tiers are updated incrementally on append.
+
+    Samples are identified by their absolute index, ie. the number
+    of values appended before them; only the last ``max_samples``
+    are kept.
+    """
+
+    fanout = 4
+
+    def __init__(self, max_samples=100000, fanout=None):
+        if fanout is not None:
+            self.fanout = fanout
+        self.max_samples = max_samples
+
+        ## Total number of appended samples
+        self.count = 0
+
+        ## Absolute index of the first stored sample
+        self.first = 0
+
+        self.values = array('d')
+        self.tiers = []
+        size = self.fanout
+        while size < max_samples:
+            self.tiers.append(_Tier(size))
+            size *= self.fanout
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        index = self.count
+        self.values.append(value)
+        self.count += 1
+        for tier in self.tiers:
+            tier.append(value, index)
+
+        ## Trim old data in chunks, not to move memory at each append
+        if len(self.values) >= self.max_samples + self.max_samples // 4:
+            self.trim()
+
+    def trim(self):
+        drop = len(self.values) - self.max_samples
+        if drop > 0:
+            del self.values[:drop]
+            self.first += drop
+            for tier in self.tiers:
+                tier.trim(self.first, self.values)
+
+    def samples(self, start, stop):
+        """
+        Get the raw samples in the [start, stop) range.
+
+        :return: a (first_index, values) tuple
+        """
+        start = max(start, self.first)
+        stop = min(stop, self.count)
+        if stop <= start:
+            return start, []
+        return start, self.values[start - self.first:stop - self.first]
+
+    def summarize(self, start, stop, columns):
+        """
+        Summarize the [start, stop) range in a number of columns
+        (eg. one per pixel), using the coarsest tier that still
+        has at least one bucket per column.
+
+        The cost is proportional to the number of columns, not
+        to the number of samples in the range. Uses NumPy, if
+        available, to speed things up.
+
+        Buckets are not split between columns: each column gets the
+        buckets from the one containing its first sample, up to the
+        one containing the first sample of the next column (the last
+        column up to the one containing ``stop - 1``). So a column
+        may include up to ``size - 1`` samples before its range, or
+        after ``stop``, and lose its last ones to the next column.
+
+        Columns before the first stored sample, or after the last
+        one, are None; so is a column whose samples all fall in
+        the first bucket of the next one. Eg. with samples from
+        2000 to 3999, ``summarize(0, 3000, 100)`` uses 16-sample
+        buckets: columns 0 to 66 are None (including column 66,
+        covering 1980-2010), column 67 (2010-2040) summarizes
+        samples 2000-2031, and column 99 (2970-3000) samples
+        2960-3007.
+
+        :return: a list of (min, max, mean) tuples, one for each
+            column, or None for columns without samples.
+        """
+        per_column = float(stop - start) / columns
+
+        tier = None
+        for candidate in self.tiers:
+            if candidate.size > per_column:
+                break
+            tier = candidate
+
+        if tier is None:
+            ## Less than fanout samples per column: use the raw values
+            data = (1, self.first, self.values, self.values,
+                    self.values, None)
+        else:
+            data = (tier.size, tier.first, tier.mins, tier.maxs,
+                    tier.sums, tier.counts)
+
+        ## Column ranges are clipped to the stored samples, then
+        ## converted to bucket ranges (see above for the edges)
+        if numpy is not None:
+            return self._summarize_numpy(start, per_column, columns, *data)
+        return self._summarize_python(start, per_column, columns, *data)
+
+    def _summarize_python(self, start, per_column, columns,
+                          size, first, mins, maxs, sums, counts):
+        bounds = [
+            min(max(int(start + x * per_column), self.first), self.count)
+            for x in xrange(columns + 1)]
+        buckets = [b // size - first for b in bounds[:-1]]
+        buckets.append((bounds[-1] - 1) // size + 1 - first)
+
+        summaries = []
+        for b0, b1 in zip(buckets, buckets[1:]):
+            if b1 <= b0:
+                summaries.append(None)
+            elif b1 - b0 == 1:
+                summaries.append((
+                    mins[b0], maxs[b0],
+                    sums[b0] / (counts[b0] if counts is not None else 1)))
+            else:
+                summaries.append((
+                    min(mins[b0:b1]), max(maxs[b0:b1]),
+                    sum(sums[b0:b1]) / (sum(counts[b0:b1])
+                                        if counts is not None else b1 - b0)))
+        return summaries
+
+    def _summarize_numpy(self, start, per_column, columns,
+                         size, first, mins, maxs, sums, counts):
+        bounds = start + numpy.arange(columns + 1) * per_column
+        bounds = numpy.clip(bounds.astype(int), self.first, self.count)
+        buckets = bounds // size - first
+        buckets[-1] = (bounds[-1] - 1) // size + 1 - first
+
+        valid = buckets[1:] > buckets[:-1]
+        if not valid.any():
+            return [None] * columns
+        starts = buckets[:-1][valid]
+        ends = buckets[1:][valid]
+        end = ends[-1]
+
+        def reduce_at(ufunc, data):
+            data = numpy.frombuffer(data, dtype=numpy.float64)[:end]
+            return ufunc.reduceat(data, starts)
+
+        if counts is not None:
+            counts = reduce_at(numpy.add, counts)
+        else:
+            counts = ends - starts
+        summaries = zip(reduce_at(numpy.minimum, mins).tolist(),
+                        reduce_at(numpy.maximum, maxs).tolist(),
+                        (reduce_at(numpy.add, sums) / counts).tolist())
+
+        if len(summaries) == columns:
+            return summaries
+        summaries = iter(summaries)
+        return [next(summaries) if v else None for v in valid.tolist()]
@@ -0,0 +1,188 @@
+"""
+Application using the SDL2 Renderer / Texture API for compositing.
+
+Displays still draw their layers in software, as usual, but instead
+of being blitted on the screen surface, each display is uploaded to
+a texture and composited by the renderer, which also scales the whole
+dashboard to fit the window.
+
+Textures hold the composed display (foreground over background), as
+anti-aliased lines drawn on a transparent layer would be blended with
+transparent black. They are uploaded whole only when the background
+changes; otherwise, only the area that changed since the last frame.
+
+Still, this is only about as fast as the default software blitting
+(drawing dominates), so it is mostly useful for scaling: see
+``example/benchmark_renderer.py``.
+
+Requires pygame >= 2.0 (for ``pygame._sdl2``). Works with the
+software renderer too (``accelerated=False``), for machines
+without a GPU.
+"""
+
+import pygame
+
+try:
+    from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError:  # pygame < 2.0
+    Window = Renderer = Texture = None
+
+from . import Application
+from .utils import lazy_property
+
+## From SDL_blendmode.h; not exported by pygame
+SDL_BLENDMODE_BLEND = 0x00000001
+
+
+class RendererApplication(Application):
+    """
+    Application compositing the displays using the SDL2 renderer.
+    """
+
+    window = None
+    renderer = None
+
+    _fps_label = None
+    _fps_texture = None
+
+    ## Whether to use hardware acceleration: True, False
+    ## (use the software renderer) or None (let SDL decide)
+    accelerated = None
+
+    def __init__(self, size=None, fullscreen=False, theme=None,
+                 accelerated=None):
+        if Renderer is None:
+            raise RuntimeError(
+                "The SDL2 renderer requires pygame >= 2.0")
+        if accelerated is not None:
+            self.accelerated = accelerated
+        super(RendererApplication, self).__init__(
+            size=size, fullscreen=fullscreen, theme=theme)
+
+    @lazy_property
+    def palette(self):
+        ## There is no screen surface: map colors in the
+        ## same format as the display surfaces.
+        surface = pygame.surface.Surface((1, 1))
+        return self.theme.get_palette(surface)
+
+    @lazy_property
+    def draw_colors(self):
+        """Theme colors, as expected by ``Renderer.draw_color``"""
+        return dict((name, pygame.Color(*rgb))
+                    for name, rgb in self.theme.colors.iteritems())
+
+    def set_theme(self, theme):
+        del self.draw_colors
+        super(RendererApplication, self).set_theme(theme)
+
+    def set_video_mode(self, resolution=None, fullscreen=False):
+        self._fullscreen = fullscreen
+
+        if resolution is None:
+            if fullscreen:
+                resolution = self._fullscreen_size
+            else:
+                resolution = self._windowed_size
+        else:
+            if fullscreen:
+                self._fullscreen_size = resolution
+            else:
+                self._windowed_size = resolution
+
+        if self.window is None:
+            self.window = Window(
+                self.application_title, resolution, resizable=True)
+            if self.accelerated is None:
+                accelerated = -1
+            else:
+                accelerated = int(self.accelerated)
+            self.renderer = Renderer(self.window, accelerated=accelerated)
+
+            ## Displays are laid out in the initial resolution, then
+            ## scaled by the renderer to the actual window size.
+            self.renderer.logical_size = resolution
+
+        if fullscreen:
+            self.window.set_fullscreen(desktop=True)
+        else:
+            self.window.set_windowed()
+            self.window.size = resolution
+
+    def flash_screen(self):
+        self.renderer.draw_color = (0xff, 0xff, 0xff, 0xff)
+        self.renderer.clear()
+        self.renderer.present()
+        pygame.time.delay(40)
+
+    def draw(self):
+        renderer = self.renderer
+        draw_colors = self.draw_colors
+
+        renderer.draw_color = draw_colors['base03']
+        renderer.clear()
+
+        for display in self.displays:
+            self.draw_display(display)
+
+        # Draw FPS label
+        texture, col = self.get_fps_texture()
+        text_rect = texture.get_rect()
+        text_rect.bottomleft = 0, self.screen_size[1]
+        renderer.draw_color = draw_colors[col]
+        renderer.fill_rect(text_rect)
+        texture.draw(dstrect=text_rect)
+
+        renderer.present()
+
+    def get_fps_texture(self):
+        """
+        Get the texture for the FPS label, updating it in place
+        only when the displayed value changes.
+
+        :return: a (texture, background_color_name) tuple
+        """
+        fps = int(self.clock.get_fps())
+        if self._fps_label is None or self._fps_label[0] != fps:
+            text, col = self.render_fps_label()
+            texture = self._fps_texture
+            if texture is None or \
+                    (texture.width, texture.height) != text.get_size():
+                texture = self._fps_texture = Texture(
+                    self.renderer, text.get_size(), streaming=True)
+                texture.blend_mode = SDL_BLENDMODE_BLEND
+            texture.update(text)
+            self._fps_label = fps, col
+        return self._fps_texture, self._fps_label[1]
+
+    def draw_display(self, display):
+        """
+        Upload the display surface to its texture, and copy
+        that on the renderer.
+
+        Textures are kept in the display entry. The whole surface
+        is uploaded only the first time, or when the background
+        changes (eg. new theme); afterwards, only the area that
+        changed (see :py:attr:`Drawable.dirty_rect`) is.
+        """
+        drawable = display['display']
+        rect = pygame.Rect(display['position'], drawable.size)
+
+        surface = drawable.surface
+        dirty = drawable.dirty_rect
+        texture = display.get('texture')
+        if texture is None or \
+                (texture.width, texture.height) != surface.get_size():
+            texture = display['texture'] = Texture(
+                self.renderer, surface.get_size(), streaming=True)
+            dirty = None
+
+        if dirty is None:
+            texture.update(surface)
+        elif dirty.width and dirty.height:
+            texture.update(surface.subsurface(dirty), area=dirty)
+        texture.draw(dstrect=rect)
+
+    @property
+    def screen_size(self):
+        return self.renderer.logical_size
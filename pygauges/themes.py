@@ -0,0 +1,107 @@
+"""
+Color themes for PyGauges displays.
+
+A theme is just a named set of RGB colors. Before being used for
+drawing, it gets resolved into a :py:class:`Palette` for a given
+surface: colors are converted once (via ``Surface.map_rgb()``) to
+the surface pixel format, so draw calls don't have to convert
+them again every frame.
+"""
+
+from .utils import colors
+
+
+def _surface_format(surface):
+    """Key identifying the pixel format of a surface"""
+    return (surface.get_bitsize(), surface.get_masks(),
+            surface.get_shifts(), surface.get_losses())
+
+
+class Theme(object):
+    """
+    A named set of colors.
+
+    Colors are referred to by name (eg. ``'base03'``, ``'red'``);
+    displays should only use names, and let the theme decide
+    the actual values.
+    """
+
+    def __init__(self, name, colors):
+        self.name = name
+        self.colors = dict(colors)
+        self._palettes = {}
+
+    def __repr__(self):
+        return '<Theme {0!r}>'.format(self.name)
+
+    def derive(self, name, **overrides):
+        """Create a new theme, replacing some of the colors"""
+        new_colors = dict(self.colors)
+        new_colors.update(overrides)
+        return Theme(name, new_colors)
+
+    def get_palette(self, surface):
+        """
+        Get the palette for this theme, mapped to the pixel
+        format of the given surface.
+
+        Palettes are cached per pixel format, so displays sharing
+        the same format share the same palette too.
+        """
+        key = _surface_format(surface)
+        if key not in self._palettes:
+            self._palettes[key] = Palette(self, surface)
+        return self._palettes[key]
+
+
+class Palette(object):
+    """
+    A theme, resolved to the pixel format of a given surface.
+
+    Indexing a palette by color name returns the mapped pixel
+    value, that can be passed directly to ``Surface.fill()``
+    and the ``pygame.draw`` functions. RGB tuples are accepted
+    as well (and mapped the first time they're requested), to
+    allow displays to use colors not in the theme.
+    """
+
+    def __init__(self, theme, surface):
+        self.theme = theme
+        self._surface = surface
+        self._mapped = dict(
+            (name, surface.map_rgb(rgb))
+            for name, rgb in theme.colors.iteritems())
+
+    def __getitem__(self, color):
+        try:
+            return self._mapped[color]
+        except KeyError:
+            if isinstance(color, basestring):
+                raise KeyError(
+                    'Color {0!r} is not defined in {1!r}'.format(
+                        color, self.theme))
+            mapped = self._mapped[color] = self._surface.map_rgb(color)
+            return mapped
+
+    def rgb(self, color):
+        """
+        Get the RGB value for a color. Needed for the few functions
+        (eg. ``Font.render()``) not accepting mapped colors.
+        """
+        if isinstance(color, basestring):
+            return self.theme.colors[color]
+        return color
+
+
+## The Solarized color themes
+## See: http://ethanschoonover.com/solarized
+solarized_dark = Theme('solarized-dark', colors)
+
+solarized_light = solarized_dark.derive(
+    'solarized-light',
+    base03=colors['base3'], base02=colors['base2'],
+    base01=colors['base1'], base00=colors['base0'],
+    base0=colors['base00'], base1=colors['base01'],
+    base2=colors['base02'], base3=colors['base03'])
+
+default_theme = solarized_dark
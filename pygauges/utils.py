@@ -3,7 +3,7 @@ Miscellaneous utilities for PyGauges displays
 """
 
 ## The Solarized color theme
-## Todo: we need a nicer way to define customizable color themes
+## Displays should use themes instead (see :py:mod:`pygauges.themes`)
 colors = {
     'base03': (0x00, 0x2b, 0x36),
     'base02': (0x07, 0x36, 0x42),
@@ -44,6 +44,9 @@ def lazy_property(fn):
         setattr(self, attr_name, value)
 
     def deleter(self):
-        delattr(self, attr_name)
+        ## Deleting a not-yet-computed value is a no-op, so that
+        ## caches can be invalidated without checking them first.
+        if hasattr(self, attr_name):
+            delattr(self, attr_name)
 
     return property(fget=getter, fset=setter, fdel=deleter, doc=fn.__doc__)